@@ -50,14 +50,17 @@ while 1 do
     local client = server:accept()
     -- make sure we don't block waiting for this client's line
     client:settimeout(10)
-    -- receive the line
-    local line, err = client:receive()
-    -- if there was no error, send it back to the client
-    if not err
-    then
+    -- keep serving commands on that connection until the client leaves or stays idle for too long.
+    while 1 do
+        -- receive the line
+        local line, err = client:receive()
+        -- client closed the connection or timed out.
+        if err then
+            break
+        end
+        -- no error, send the response back to the client
         local ret = commandHandling(line, client)
         client:send(string.format('%s%s', ret, eol))
-
     end
 
     -- done with client, close the object
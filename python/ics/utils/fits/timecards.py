@@ -1,7 +1,7 @@
 import numpy as np
 import time
+from zoneinfo import ZoneInfo
 
-import pytz
 import astropy.time
 import astropy.coordinates
 
@@ -27,7 +27,7 @@ class TimeCards(object):
         self.endTime = None
         self.location = astropy.coordinates.EarthLocation.of_site(location)
         self.timezoneName = timezoneName
-        self.timezone = pytz.timezone(timezoneName)
+        self.timezone = ZoneInfo(timezoneName)
 
     def _now(self):
         """ Return an astropy.time.Time for now. """
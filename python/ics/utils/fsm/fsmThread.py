@@ -18,7 +18,7 @@ class LockedThread(QThread):
 
     @property
     def isLocked(self):
-        return not self.isAvailable
+        return self.onGoingCmd is not False
 
     def lock(self, cmd):
         self.onGoingCmd = cmd
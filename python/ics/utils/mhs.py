@@ -3,11 +3,9 @@ from ics.utils import time as pfsTime
 def isoTs(t=None):
     """Filthy function to get a formatted time string. """
     if t is None:
-        ts = pfsTime.Time.now()
-    else:
-        ts = pfsTime.Time.fromtimestamp(t)
+        return pfsTime.Time.nowIsoformat()
 
-    return ts.isoformat()
+    return pfsTime.convert.datetime_to_isoformat(pfsTime.convert.datetime_from_timestamp(t))
 
 class NullCmd:
     """Dummy Command for when we are not using actorcore code."""
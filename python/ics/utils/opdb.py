@@ -1,3 +1,5 @@
+import threading
+
 import numpy as np
 import psycopg2
 
@@ -5,35 +7,75 @@ import psycopg2
 class opDB:
     """placeholder to retrieve/insert data from opDB"""
     host = 'db-ics'
+    # connections are kept open and reused, one per thread.
+    local = threading.local()
+
+    @staticmethod
+    def connect(ping=False):
+        """ return connection object, password needs to be defined in /home/user/.pgpass
+        if ping, the kept connection is checked first and replaced if the server dropped it. """
+        conn = getattr(opDB.local, 'conn', None)
+
+        if ping and conn is not None and not conn.closed:
+            try:
+                with conn.cursor() as curs:
+                    curs.execute('SELECT 1')
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                opDB.disconnect()
+                conn = None
+
+        # psycopg2 flags the connection as closed once it is broken, reconnect in that case.
+        if conn is None or conn.closed:
+            conn = psycopg2.connect(dbname='opdb', user='pfs', host=opDB.host)
+            opDB.local.conn = conn
+
+        return conn
+
+    @staticmethod
+    def disconnect():
+        """ close this thread connection, if any """
+        conn = getattr(opDB.local, 'conn', None)
+        opDB.local.conn = None
+
+        if conn is not None:
+            conn.close()
 
     @staticmethod
-    def connect():
-        """ return connection object, password needs to be defined in /home/user/.pgpass """
-        return psycopg2.connect(dbname='opdb', user='pfs', host=opDB.host)
+    def fetch(query, params, fetchMethod):
+        """ execute query and fetch result, retry once on a fresh connection if the kept one is not usable anymore """
+        for nAttempt in range(2):
+            try:
+                # with statement only ends the transaction, connection remains open.
+                with opDB.connect() as conn:
+                    with conn.cursor() as curs:
+                        curs.execute(query, params)
+                        return fetchMethod(curs)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                opDB.disconnect()
+                if nAttempt:
+                    raise
 
     @staticmethod
-    def fetchall(query):
-        """ fetch all rows from query """
-        with opDB.connect() as conn:
-            with conn.cursor() as curs:
-                curs.execute(query)
-                return np.array(curs.fetchall())
+    def fetchall(query, params=None):
+        """ fetch all rows from query, params are bound by the driver if any """
+        return np.array(opDB.fetch(query, params, lambda curs: curs.fetchall()))
 
     @staticmethod
-    def fetchone(query):
-        """ fetch one row from query """
-        with opDB.connect() as conn:
-            with conn.cursor() as curs:
-                curs.execute(query)
-                return np.array(curs.fetchone())
+    def fetchone(query, params=None):
+        """ fetch one row from query, params are bound by the driver if any """
+        return np.array(opDB.fetch(query, params, lambda curs: curs.fetchone()))
 
     @staticmethod
     def commit(query, kwargs):
-        """ execute query and commit """
-        with opDB.connect() as conn:
-            with conn.cursor() as curs:
-                curs.execute(query, kwargs)
-            conn.commit()
+        """ execute query and commit, not retried but only executed on a live connection """
+        try:
+            with opDB.connect(ping=True) as conn:
+                with conn.cursor() as curs:
+                    curs.execute(query, kwargs)
+                conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            opDB.disconnect()
+            raise
 
     @staticmethod
     def insert(table, **kwargs):
@@ -2,18 +2,14 @@ __author__ = 'alefur'
 
 import logging
 import operator
+import threading
 import time
-from datetime import datetime as dt
-from importlib import reload
 
 import ics.utils.sps.lamps.utils.lampState as lampUtils
 import ics.utils.sps.pdu.simulators.aten as simulator
 from ics.utils.fsm.fsmThread import FSMThread
 from ics.utils.sps.pdu.controllers.aten import aten as atenPdu
 
-reload(lampUtils)
-reload(simulator)
-
 
 class aten(atenPdu):
     # for state machine, not need to temporize before init
@@ -42,8 +38,10 @@ class aten(atenPdu):
         self.addStateCB('TRIGGERING', self._doGo)
         self.sim = simulator.Sim()
 
+        self.ioBuffer = None
         self.loginTime = 0
         self.abortWarmup = False
+        self.abortEvent = threading.Event()
         self.config = dict()
         self.lampStates = dict()
 
@@ -52,7 +50,8 @@ class aten(atenPdu):
 
     @property
     def lampsOn(self):
-        return [lamp for lamp in self.lampNames if self.lampStates[lamp].lampOn]
+        # lampStates is filled in lampNames order at init.
+        return [lamp for lamp, lampState in self.lampStates.items() if lampState.lampOn]
 
     def _loadCfg(self, cmd, mode=None):
         """Load iis configuration.
@@ -162,17 +161,20 @@ class aten(atenPdu):
         :raise: Exception with warning message.
         """
 
-        def waitUntil(end, ti=0.01):
-            """ Wait until time.time() >end.
+        def waitUntil(end, ti=1):
+            """ Wait until time.time() >end, waking up immediately if aborted.
 
             :param end: nb of secs since epoch.
+            :param ti: max time blocking on the abort event before handling thread timeout.
             """
-            while time.time() < end:
-                time.sleep(ti)
-                self.handleTimeout()
-                if self.abortWarmup:
+            remaining = end - time.time()
+            while remaining > 0:
+                if self.abortEvent.wait(timeout=min(remaining, ti)):
                     raise UserWarning('sources warmup aborted')
 
+                self.handleTimeout()
+                remaining = end - time.time()
+
         self._switchOn(cmd, lamps)
 
         toBeWarmed = lamps if lamps else self.lampsOn
@@ -207,11 +209,10 @@ class aten(atenPdu):
         switchOff.sort(key=lambda tup: tup[1])
 
         for lamp, offTiming in switchOff:
-            while dt.utcnow() < offTiming:
-                time.sleep(0.01)
-                if self.abortWarmup:
-                    self.switchOff(cmd, self.lampsOn)
-                    raise UserWarning('sources warmup aborted')
+            # sleep until next lamp is due to be switched off, return immediately if aborted.
+            if self.abortEvent.wait(timeout=max(0, offTiming - time.monotonic())):
+                self.switchOff(cmd, self.lampsOn)
+                raise UserWarning('sources warmup aborted')
 
             self._switchOneOff(cmd, lamp)
 
@@ -236,7 +237,8 @@ class aten(atenPdu):
             list of lamp to switch on.
         """
         # dont switch lamp which are already on.
-        toSwitchOn = [lamp for lamp in lamps if lamp not in self.lampsOn]
+        lampsOn = set(self.lampsOn)
+        toSwitchOn = [lamp for lamp in lamps if lamp not in lampsOn]
 
         # switch all lamps on first.
         for lamp in toSwitchOn:
@@ -304,10 +306,12 @@ class aten(atenPdu):
     def doAbort(self):
         """Abort warmup."""
         self.abortWarmup = True
+        self.abortEvent.set()
 
         # see ics.utils.fsm.fsmThread.LockedThread
         self.waitForCommandToFinish()
         self.abortWarmup = False
+        self.abortEvent.clear()
 
         return
 
@@ -1,17 +1,14 @@
 __author__ = 'alefur'
 
 import logging
+import threading
 import time
-from importlib import reload
 
 import ics.utils.sps.lamps.simulators.digitalLoggers as simulator
 import ics.utils.sps.lamps.utils.lampState as lampUtils
 import ics.utils.tcp.bufferedSocket as bufferedSocket
 from ics.utils.fsm.fsmThread import FSMThread
 
-reload(lampUtils)
-reload(simulator)
-
 
 class digitalLoggers(FSMThread, bufferedSocket.EthComm):
     # for state machine, not need to temporize before init
@@ -38,6 +35,7 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
 
         self.monitor = 0
         self.abortWarmup = False
+        self.abortEvent = threading.Event()
         self.config = dict()
         self.outletConfig = dict()
         self.lampStates = dict()
@@ -57,7 +55,8 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
 
     @property
     def lampsOn(self):
-        return [lamp for lamp in self.lampNames if self.lampStates[lamp].lampOn]
+        # lampStates is filled in lampNames order at init.
+        return [lamp for lamp, lampState in self.lampStates.items() if lampState.lampOn]
 
     def _loadCfg(self, cmd, mode=None):
         """Load lamps configuration.
@@ -128,12 +127,14 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
         :param lampState: single lamp state
         :raise: Exception with warning message.
         """
-        lamp, state = [r.strip() for r in lampState.split('=')]
+        # replies are already stripped, the server does not add any whitespace around '='.
+        lamp, __, state = lampState.partition('=')
+        lampStateObj = self.lampStates.get(lamp)
 
         # if the outlet is actually a lamp, which is no longer a guarantee.
-        if lamp in self.lampStates.keys():
-            self.lampStates[lamp].setState(state, genTimeStamp=genTimeStamp)
-            cmd.inform(f'{lamp}={str(self.lampStates[lamp])}')
+        if lampStateObj is not None:
+            lampStateObj.setState(state, genTimeStamp=genTimeStamp)
+            cmd.inform(f'{lamp}={str(lampStateObj)}')
         # crude outlet status otherwise.
         else:
             cmd.inform(f'{lamp}={state}')
@@ -145,7 +146,7 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
         :param states: all lamp states
         :raise: Exception with warning message.
         """
-        for lampState in states.split(','):
+        for lampState in states.strip().split(','):
             self.genKeys(cmd, lampState, genTimeStamp=genTimeStamp)
 
     def crudeSwitch(self, cmd, outletName, desiredState):
@@ -187,7 +188,7 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
         :param cmd: current command.
         :raise: Exception with warning message.
         """
-        cmdStr = f'prepare {" ".join(sum([[lamp, str(time)] for lamp, time in self.config.items()], []))}'
+        cmdStr = f'prepare {" ".join(f"{lamp} {time}" for lamp, time in self.config.items())}'
         return self.sendOneCommand(cmdStr, cmd=cmd)
 
     def _doWarmup(self, cmd, lamps, warmingTime=None):
@@ -199,20 +200,25 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
         :raise: Exception with warning message.
         """
 
-        def waitUntil(end, ti=0.01):
-            """ Wait until time.time() >end.
+        def waitUntil(end, ti=1):
+            """ Wait until time.time() >end, waking up immediately if aborted.
 
             :param end: nb of secs since epoch.
+            :param ti: max time blocking on the abort event before handling thread timeout.
             """
-            while time.time() < end:
-                time.sleep(ti)
-                self.handleTimeout()
-                if self.abortWarmup:
+            remaining = end - time.time()
+            while remaining > 0:
+                if self.abortEvent.wait(timeout=min(remaining, ti)):
                     raise UserWarning('sources warmup aborted')
 
+                self.handleTimeout()
+                remaining = end - time.time()
+
+        lampsOn = set(self.lampsOn)
+
         for lamp in lamps:
             # no need to switch on.
-            if lamp not in self.lampsOn:
+            if lamp not in lampsOn:
                 lampState = self.crudeSwitch(cmd, lamp, 'on')
                 self.genKeys(cmd, lampState, genTimeStamp=True)
 
@@ -238,11 +244,15 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
         timeout = max(self.config.values()) + 2
         timeLim = time.time() + timeout + 10
 
+        # the kept-alive socket may have been dropped by the server during warmup, and go cannot be retried blindly,
+        # so always start the sequence from a fresh connection.
+        self._closeComm(cmd)
+        self.ioBuffer.reset()
+
         # Dont close socket in that case.
-        replies = bufferedSocket.EthComm.sendOneCommand(self, cmdStr='go', cmd=cmd).split('\n')
-        states = replies[-1]
+        *replies, states = bufferedSocket.EthComm.sendOneCommand(self, cmdStr='go', cmd=cmd).split('\n')
 
-        for reply in replies[:len(replies) - 1]:
+        for reply in replies:
             cmd.inform(f'text="{reply}"')
 
         self.genAllKeys(cmd, states)
@@ -257,12 +267,13 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
             if time.time() > timeLim:
                 raise TimeoutError('lamps has not been triggered correctly')
 
-        status, ret = reply.split(';;')
+        status, __, ret = reply.partition(';;')
 
         if status != 'OK':
             raise RuntimeError(ret)
 
-        self.genAllKeys(cmd, states)
+        # final reply carries the post-sequence outlet states, no need to re-emit the initial ones.
+        self.genAllKeys(cmd, ret)
         self._closeComm(cmd)
 
     def _getOutletsConfig(self, cmd):
@@ -273,8 +284,9 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
         """
         outlets = self.sendOneCommand('getOutletsConfig', cmd=cmd)
 
-        for ret in outlets.split(','):
-            cmd.inform(ret)
+        outletKeys = outlets.split(',')
+
+        for ret in outletKeys:
             outlet, lamp = [r.strip() for r in ret.split('=')]
 
             # additional check that the pdu config/actor config actually match
@@ -283,6 +295,9 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
 
             self.outletConfig[outlet] = lamp
 
+        # generate all outlet keywords within a single reply.
+        cmd.inform(';'.join(outletKeys))
+
         notConfigured = set(self.lampNames) - set(self.outletConfig.values())
         if notConfigured:
             raise ValueError(f'lamps : {",".join(notConfigured)} not described in pdu config')
@@ -292,6 +307,7 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
     def doAbort(self):
         """Abort warmup."""
         self.abortWarmup = True
+        self.abortEvent.set()
 
         # if currently in the go sequence.
         if self.substates.current == 'TRIGGERING':
@@ -303,6 +319,7 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
         # see ics.utils.fsm.fsmThread.LockedThread
         self.waitForCommandToFinish()
         self.abortWarmup = False
+        self.abortEvent.clear()
 
         return
 
@@ -315,9 +332,26 @@ class digitalLoggers(FSMThread, bufferedSocket.EthComm):
         :return: reply : the single response string, with EOLs stripped.
         :raise: IOError : from any communication errors.
         """
-        # The current lua tcp server is really simple and close the connection after a single command.
+        # The lua tcp server keeps the connection open, but drops it after being idle for a while.
         # I'm not even mentioning threading here ....
-        reply = bufferedSocket.EthComm.sendOneCommand(self, cmdStr=cmdStr, doClose=True, cmd=cmd)
+        # Note that the lua server is single-threaded, so an idle client holds it for up to 10s, blocking any other
+        # client for that long.
+        reconnect = self.sock is not None
+
+        try:
+            reply = bufferedSocket.EthComm.sendOneCommand(self, cmdStr=cmdStr, doClose=doClose, cmd=cmd)
+        except OSError:
+            if not reconnect:
+                raise
+            reply = ''
+
+        if not reply and reconnect:
+            # connection has been closed on the server side, just reconnect and try again.
+            self.logger.debug(f'{self.name} connection dropped by server, reconnecting...')
+            self.closeSock()
+            self.ioBuffer.reset()
+            reply = bufferedSocket.EthComm.sendOneCommand(self, cmdStr=cmdStr, doClose=doClose, cmd=cmd)
+
         status, ret = reply.split(';;')
 
         if status != 'OK':
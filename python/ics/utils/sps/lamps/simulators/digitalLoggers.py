@@ -3,7 +3,8 @@ __author__ = 'alefur'
 import operator
 import socket
 import time
-from threading import Thread
+from collections import deque
+from threading import Event, Thread
 
 import ics.utils.sps.lamps.utils.lampState as lampState
 
@@ -16,9 +17,11 @@ class Sim(socket.socket):
         """Fake lamps tcp server."""
         socket.socket.__init__(self, socket.AF_INET, socket.SOCK_STREAM)
         self.outlets = dict([(lamp, 'off') for lamp in Sim.lampNames])
-        self.buf = []
+        self.stateStr = self.genState()
+        self.outletsConfigStr = ','.join([f'outlet0{i + 1}={lamp}' for i, lamp in enumerate(self.lampNames)])
+        self.buf = deque()
         self.config = dict()
-        self.doAbort = False
+        self.doAbort = Event()
 
     def connect(self, server):
         """Fake the connection to tcp server."""
@@ -32,9 +35,9 @@ class Sim(socket.socket):
     def sendall(self, cmdStr, flags=None):
         """Send fake packets, append fake response to buffer."""
         time.sleep(0.02)
-        cmdStr, __ = cmdStr.decode().split('\r\n')
+        cmdStr = cmdStr.rstrip(b'\r\n').decode('ascii')
 
-        if 'prepare' in cmdStr:
+        if cmdStr.startswith('prepare'):
             lampsArgs = cmdStr.split(' ')[1:]
             self.config.clear()
             for i in range(int(len(lampsArgs) / 2)):
@@ -42,29 +45,29 @@ class Sim(socket.socket):
             time.sleep(0.1)
             self.buf.append('OK;;OKtcpover\n')
 
-        elif 'getState' in cmdStr:
+        elif cmdStr.startswith('getState'):
             lampStates = self.getState()
             time.sleep(0.1)
             self.buf.append(f'OK;;{lampStates}tcpover\n')
 
-        elif 'getOutletsConfig' in cmdStr:
+        elif cmdStr.startswith('getOutletsConfig'):
             lampStates = self.getOutletsConfig()
             time.sleep(0.1)
             self.buf.append(f'OK;;{lampStates}tcpover\n')
 
-        elif 'switch' in cmdStr:
+        elif cmdStr.startswith('switch'):
             __, lamp, state = cmdStr.split(' ')
-            self.outlets[lamp] = state
+            self.setOutlet(lamp, state)
             time.sleep(0.1)
             lampState = f'{lamp}={state}'
             self.buf.append(f'OK;;{lampState}tcpover\n')
 
-        elif 'go' in cmdStr:
-            self.doAbort = False
+        elif cmdStr.startswith('go'):
+            self.doAbort.clear()
             self.go()
 
-        elif 'abort' in cmdStr:
-            self.doAbort = True
+        elif cmdStr.startswith('abort'):
+            self.doAbort.set()
             self.buf.append('tcpover\n')
 
     def go(self):
@@ -83,40 +86,48 @@ class Sim(socket.socket):
             start.append(time.time())
             stop.append(start[i] + secs)
             lamps.append(lamp)
-            self.outlets[lamp] = 'on'
+            self.setOutlet(lamp, 'on')
             self.buf.append(f'{lamp}=ontcpover\n')
 
-        f1 = Thread(target=self.fireLamps, args=(lamps, stop, longest))
+        f1 = Thread(target=self.fireLamps, args=(lamps, stop))
         f1.start()
 
-    def fireLamps(self, lamps, stop, longest):
-        while 1:
-            for i in range(len(lamps)):
-                lamp = lamps[i]
-                if (self.outlets[lamp] == 'on' and time.time() > stop[i]) or self.doAbort:
-                    self.outlets[lamp] = 'off'
-                    self.buf.append(f'{lamp}=offtcpover\n')
-
-            if self.outlets[longest] == 'off':
-                break
+    def fireLamps(self, lamps, stop):
+        for offTiming, lamp in sorted(zip(stop, lamps)):
+            # sleep until next lamp is due to be switched off, return immediately if aborted.
+            self.doAbort.wait(timeout=max(0, offTiming - time.time()))
+            self.setOutlet(lamp, 'off')
+            self.buf.append(f'{lamp}=offtcpover\n')
 
         self.buf.append(f'OK;;{self.getState()}tcpover\n')
 
-    def getState(self):
+    def setOutlet(self, lamp, state):
+        """Set outlet state and regenerate state string."""
+        self.outlets[lamp] = state
+        self.stateStr = self.genState()
+
+    def genState(self):
         return ','.join([f'{lamp}={state}' for lamp, state in self.outlets.items()])
 
+    def getState(self):
+        return self.stateStr
+
     def getOutletsConfig(self):
-        return ','.join([f'outlet0{i + 1}={lamp}' for i, lamp in enumerate(self.lampNames)])
+        return self.outletsConfigStr
 
     def recv(self, buffersize, flags=None):
-        """Return and remove fake response from buffer."""
+        """Return and remove fake responses from buffer, as many as buffersize allows."""
         time.sleep(0.02)
-        try:
-            ret = self.buf[0]
-            self.buf = self.buf[1:]
-            return str(ret).encode()
-        except IndexError:
+        if not self.buf:
             raise IOError
 
+        ret = self.buf.popleft()
+
+        # like a real stream socket, a single read can service several pending replies.
+        while self.buf and len(ret) + len(self.buf[0]) <= buffersize:
+            ret += self.buf.popleft()
+
+        return str(ret).encode()
+
     def close(self):
         pass
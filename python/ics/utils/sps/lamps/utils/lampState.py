@@ -1,9 +1,14 @@
 __author__ = 'alefur'
 
+import time
+from types import MappingProxyType
+
 import ics.utils.time as pfsTime
 
-warmingTime = dict(neon=15, xenon=15, krypton=15, argon=15, halogen=15, hgar=60, allFiberLamp=15, hgcd=60)
-allLamps = list(warmingTime.keys())
+# read-only constants.
+warmingTime = MappingProxyType(dict(neon=15, xenon=15, krypton=15, argon=15, halogen=15, hgar=60, allFiberLamp=15,
+                                    hgcd=60))
+allLamps = tuple(warmingTime.keys())
 
 
 class LampState(object):
@@ -17,15 +22,22 @@ class LampState(object):
         self.name = name
         self.state = 'unknown'
         self.onTimestamp = self.offTimestamp = pfsTime.timestamp()
+        # monotonic clock counterpart of onTimestamp, only used to compute durations.
+        self.onMonotonic = time.monotonic()
+        # formatted keyword value, only regenerated when state or timestamps change.
+        self.keyStr = None
 
     @property
     def lampOn(self):
         return self.state == 'on'
 
     def __str__(self):
-        return ','.join([f'{self.state}',
-                         f'{pfsTime.Time.fromtimestamp(self.offTimestamp).isoformat()}',
-                         f'{pfsTime.Time.fromtimestamp(self.onTimestamp).isoformat()}'])
+        if self.keyStr is None:
+            # no astronomical math here, formatting straight from datetime is much cheaper than astropy.
+            offIso, onIso = [pfsTime.convert.datetime_to_isoformat(pfsTime.convert.datetime_from_timestamp(ts))
+                             for ts in (self.offTimestamp, self.onTimestamp)]
+            self.keyStr = ','.join([f'{self.state}', offIso, onIso])
+        return self.keyStr
 
     def needWarmup(self, now):
         """Does the lamp needs to warmed up during wipe"""
@@ -38,6 +50,9 @@ class LampState(object):
 
     def setState(self, state, genTimeStamp=False):
         """ Update current state and generate timestamp is requested. """
+        if state != self.state:
+            self.keyStr = None
+
         self.state = state
         if genTimeStamp:
             self.genTimeStamp()
@@ -48,16 +63,19 @@ class LampState(object):
 
         if self.lampOn:
             self.onTimestamp = now
+            self.onMonotonic = time.monotonic()
         else:
             self.offTimestamp = now
 
+        self.keyStr = None
+
     def switchOffTiming(self, seconds):
-        """ Predict when the lamp is supposed to turn off """
-        return self.onTimestamp + seconds
+        """ Predict when the lamp is supposed to turn off, as time.monotonic() value. """
+        return self.onMonotonic + seconds
 
     def elapsed(self):
         """ Return number of seconds since the lamp is actually on. """
         if not self.lampOn:
             return 0
 
-        return pfsTime.timestamp() - self.onTimestamp
+        return time.monotonic() - self.onMonotonic
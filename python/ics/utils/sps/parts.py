@@ -8,6 +8,8 @@ class Part(object):
     ----------
     state : `str`
         Current operation state.
+    identifier : `str`
+        Part identifier, set once by each subclass since specModule and therefore identifier cannot change.
     """
     knownStates = ['ok', 'broken', 'none']
 
@@ -18,6 +20,10 @@ class Part(object):
         self.specModule = specModule
         self.state = state
 
+    def __str__(self):
+        """Part identifier."""
+        return self.identifier
+
     @property
     def operational(self):
         return self.state == 'ok'
@@ -38,10 +44,7 @@ class Rda(Part):
 
     def __init__(self, specModule, state='none'):
         Part.__init__(self, specModule, state=state)
-
-    def __str__(self):
-        """Part identifier."""
-        return f'rda_{self.specModule.specName}'
+        self.identifier = f'rda_{specModule.specName}'
 
     def checkTarget(self, targetPosition):
         """Check if rda operational state allow reaching the targetPosition. """
@@ -66,10 +69,7 @@ class Fca(Part):
 
     def __init__(self, specModule, state='none'):
         Part.__init__(self, specModule, state=state)
-
-    def __str__(self):
-        """Part identifier."""
-        return f'fca_{self.specModule.specName}'
+        self.identifier = f'fca_{specModule.specName}'
 
 
 class Bia(Part):
@@ -86,10 +86,7 @@ class Bia(Part):
 
     def __init__(self, specModule, state='none'):
         Part.__init__(self, specModule, state=state)
-
-    def __str__(self):
-        """Part identifier."""
-        return f'bia_{self.specModule.specName}'
+        self.identifier = f'bia_{specModule.specName}'
 
 
 class Iis(Part):
@@ -106,10 +103,7 @@ class Iis(Part):
 
     def __init__(self, specModule, state='none'):
         Part.__init__(self, specModule, state=state)
-
-    def __str__(self):
-        """Part identifier."""
-        return f'iis_{self.specModule.specName}'
+        self.identifier = f'iis_{specModule.specName}'
 
 
 class Shutter(Part):
@@ -124,17 +118,23 @@ class Shutter(Part):
     """
     mask = dict(b=1, r=2)
     knownStates = ['ok', 'broken', 'open', 'closed', 'none']
+    # outputLight as a function of (inputLight, openShutter) for each operating state.
+    lightPathPerState = dict(ok=lambda inputLight, openShutter: ('timed' if inputLight == 'continuous' else inputLight)
+                             if openShutter else 'none',
+                             open=lambda inputLight, openShutter: inputLight,
+                             none=lambda inputLight, openShutter: inputLight,
+                             closed=lambda inputLight, openShutter: 'none',
+                             broken=lambda inputLight, openShutter: inputLight if inputLight == 'none' else 'unknown')
 
     def __init__(self, specModule, arm, state='none'):
         self.arm = arm
         self.lightBeam = True
         Part.__init__(self, specModule, state=state)
+        self.identifier = f'{arm}sh_{specModule.specName}'
 
     def __str__(self):
         """Part identifier."""
-        name = f'{self.arm}sh_{self.specModule.specName}'
-        name = f'{name}.closed' if not self.lightBeam else name
-        return name
+        return self.identifier if self.lightBeam else f'{self.identifier}.closed'
 
     @property
     def bitMask(self):
@@ -155,23 +155,7 @@ class Shutter(Part):
         outputLight : `str`
              Output light beam(continuous, timed, none, unknown).
         """
-
-        if self.state == 'ok':
-            if openShutter:
-                outputLight = 'timed' if inputLight == 'continuous' else inputLight
-            else:
-                outputLight = 'none'
-
-        elif self.state in ['open', 'none']:
-            outputLight = inputLight
-
-        elif self.state == 'closed':
-            outputLight = 'none'
-
-        elif self.state == 'broken':
-            outputLight = inputLight if inputLight == 'none' else 'unknown'
-
-        return outputLight
+        return Shutter.lightPathPerState[self.state](inputLight, openShutter)
 
     def setLightBeam(self, lightBeam):
         self.lightBeam = lightBeam
@@ -193,10 +177,11 @@ class Cam(SpectroIds, Part):
         SpectroIds.__init__(self, f'{fpa}{specModule.specNum}')
         self.specModule = specModule
         Part.__init__(self, specModule, state=state)
+        self.identifier = self.camName
 
     def __str__(self):
-        """Part identifier."""
-        return self.camName
+        """Part identifier, SpectroIds.__str__ would come first otherwise."""
+        return self.identifier
 
     @property
     def lightSource(self):
@@ -6,6 +6,14 @@ import opscore.protocols.keys as keys
 import opscore.protocols.types as types
 from ics.utils.threading import threaded, singleShot
 
+# Define typed command arguments, only built once per process.
+pduKeys = keys.KeysDictionary("pdu__pdu", (1, 1),
+                              keys.Key("on", types.String() * (1, None),
+                                       help='which outlet to switch on.'),
+                              keys.Key("off", types.String() * (1, None),
+                                       help='which outlet to switch off.'),
+                              )
+
 
 class PduCmd(object):
     def __init__(self, actor):
@@ -25,13 +33,8 @@ class PduCmd(object):
 
         ]
 
-        # Define typed command arguments for the above commands.
-        self.keys = keys.KeysDictionary("pdu__pdu", (1, 1),
-                                        keys.Key("on", types.String() * (1, None),
-                                                 help='which outlet to switch on.'),
-                                        keys.Key("off", types.String() * (1, None),
-                                                 help='which outlet to switch off.'),
-                                        )
+        # Typed command arguments for the above commands.
+        self.keys = pduKeys
 
     @property
     def controller(self):
@@ -52,13 +55,16 @@ class PduCmd(object):
 
         switchOn = cmdKeys['on'].values if 'on' in cmdKeys else []
         switchOff = cmdKeys['off'].values if 'off' in cmdKeys else []
-        powerNames = dict([(name, 'on') for name in switchOn] + [(name, 'off') for name in switchOff])
+        ports = self.controller.powerPorts
 
-        for name in powerNames.keys():
-            if name not in self.controller.powerPorts.keys():
-                raise ValueError('%s : unknown port' % name)
+        powerPorts = dict()
+        # off is applied last, so it wins if a port is requested both on and off.
+        for names, state in [(switchOn, 'on'), (switchOff, 'off')]:
+            for name in names:
+                if name not in ports:
+                    raise ValueError(f'{name} : unknown port')
 
-        powerPorts = dict([(self.controller.powerPorts[name], state) for name, state in powerNames.items()])
+                powerPorts[ports[name]] = state
 
         self.controller.substates.switch(cmd, powerPorts=powerPorts)
         self.controller.generate(cmd)
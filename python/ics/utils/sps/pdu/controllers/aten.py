@@ -1,6 +1,7 @@
 __author__ = 'alefur'
 
 import logging
+import socket
 import time
 
 import ics.utils.sps.pdu.simulators.aten as atenSim
@@ -17,6 +18,10 @@ class aten(FSMThread, bufferedSocket.EthComm):
     socketTimeout = 1
     bufferTimeout = 1
     loginTimeout = 50
+    # send all meter reads within a single packet, firmware needs to handle pipelined commands.
+    pipelineIO = False
+    # simulator delay per command, in seconds.
+    simLatency = 0
 
     def __init__(self, actor, name, loglevel=logging.DEBUG):
         """This sets up the connections to/from the hub, the logger, and the twisted reactor.
@@ -36,6 +41,7 @@ class aten(FSMThread, bufferedSocket.EthComm):
         self.addStateCB('SWITCHING', self.switching)
         self.sim = atenSim.Sim()
 
+        self.ioBuffer = None
         self.loginTime = 0
 
         self.logger = logging.getLogger(self.name)
@@ -69,9 +75,8 @@ class aten(FSMThread, bufferedSocket.EthComm):
                                         host=controllerConfig['host'],
                                         port=controllerConfig['port'],
                                         EOL='\r\n', stripTelnet=True)
-        self.powerNames = dict([(str(key).zfill(2), val) for (key, val) in controllerConfig['outlets'].items()])
-        self.powerPorts = dict([(val, key) for (key, val) in self.powerNames.items()])
-
+        self.powerNames = {str(key).zfill(2): val for key, val in controllerConfig['outlets'].items()}
+        self.powerPorts = {val: key for key, val in self.powerNames.items()}
 
         def loadOptionalConfig(option):
             """ Convenience to load optional config."""
@@ -85,6 +90,8 @@ class aten(FSMThread, bufferedSocket.EthComm):
         self.socketTimeout = loadOptionalConfig('socketTimeout')
         self.bufferTimeout = loadOptionalConfig('bufferTimeout')
         self.loginTimeout = loadOptionalConfig('loginTimeout')
+        self.pipelineIO = loadOptionalConfig('pipelineIO')
+        self.sim.latency = loadOptionalConfig('simLatency')
 
     def _openComm(self, cmd):
         """Open socket with pdu controller or simulate it.
@@ -92,7 +99,13 @@ class aten(FSMThread, bufferedSocket.EthComm):
         :param cmd: current command.
         :raise: socket.error if the communication has failed.
         """
-        self.ioBuffer = bufferedSocket.BufferedSocket(self.name + 'IO', EOL='\r\n\r\n>', timeout=self.bufferTimeout)
+        if self.ioBuffer is None:
+            self.ioBuffer = bufferedSocket.BufferedSocket(self.name + 'IO', EOL='\r\n\r\n>', timeout=self.bufferTimeout)
+        else:
+            self.ioBuffer.reset()
+            self.ioBuffer.EOL = '\r\n\r\n>'
+            self.ioBuffer.timeout = self.bufferTimeout
+
         s = self.connectSock()
 
     def _closeComm(self, cmd):
@@ -103,6 +116,10 @@ class aten(FSMThread, bufferedSocket.EthComm):
         self.closeSock()
         self.loginTime = 0
 
+        # do not let stale bytes from that session leak into the next one.
+        if self.ioBuffer is not None:
+            self.ioBuffer.reset()
+
     def _testComm(self, cmd):
         """Test communication.
 
@@ -128,21 +145,37 @@ class aten(FSMThread, bufferedSocket.EthComm):
         :type outlet: str
         :raise: Exception with warning message.
         """
-        state = self.safeOneCommand('read status o%s simple' % outlet, cmd=cmd)
-        try:
-            v = float(self.sendOneCommand('read meter olt o%s volt simple' % outlet, cmd=cmd))
-        except:
-            v = float('nan')
-        try:
-            a = float(self.sendOneCommand('read meter olt o%s curr simple' % outlet, cmd=cmd))
-        except:
-            a = float('nan')
-        try:
-            w = float(self.sendOneCommand('read meter olt o%s pow simple' % outlet, cmd=cmd))
-        except:
-            w = float('nan')
+        state = self.safeOneCommand(f'read status o{outlet} simple', cmd=cmd)
+
+        if self.pipelineIO:
+            try:
+                v, a, w = [float(ret) for ret in self.sendCommands([f'read meter olt o{outlet} volt simple',
+                                                                    f'read meter olt o{outlet} curr simple',
+                                                                    f'read meter olt o{outlet} pow simple'],
+                                                                   cmd=cmd)]
+            except Exception:
+                # pending replies would pollute the next ones.
+                self._closeComm(cmd)
+                v = a = w = float('nan')
+        else:
+            v, a, w = [self._meter(cmd, outlet, kind) for kind in ('volt', 'curr', 'pow')]
+
+        cmd.inform(f'pduPort{int(outlet)}={self.powerNames[outlet]},{state},{v:.2f},{a:.2f},{w:.2f}')
 
-        cmd.inform('pduPort%d=%s,%s,%.2f,%.2f,%.2f' % (int(outlet), self.powerNames[outlet], state, v, a, w))
+    def _meter(self, cmd, outlet, kind):
+        """Read a given meter for a given outlet.
+
+        :param cmd: current command.
+        :param outlet: outlet number (ex : o01).
+        :type outlet: str
+        :param kind: volt|curr|pow.
+        :type kind: str
+        :return: meter value, nan if the read failed.
+        """
+        try:
+            return float(self.sendOneCommand(f'read meter olt o{outlet} {kind} simple', cmd=cmd))
+        except Exception:
+            return float('nan')
 
     def switching(self, cmd, powerPorts):
         """Switch on/off powerPorts dictionary.
@@ -153,7 +186,7 @@ class aten(FSMThread, bufferedSocket.EthComm):
         :raise: Exception with warning message.
         """
         for outlet, state in powerPorts.items():
-            self.safeOneCommand('sw o%s %s imme' % (outlet, state), cmd=cmd)
+            self.safeOneCommand(f'sw o{outlet} {state} imme', cmd=cmd)
             self.portStatus(cmd, outlet=outlet)
 
     def loginCommand(self, cmdStr, cmd=None, ioEOL=None):
@@ -166,7 +199,7 @@ class aten(FSMThread, bufferedSocket.EthComm):
         self.ioBuffer.EOL = ioEOL if ioEOL is not None else self.ioBuffer.EOL
         return bufferedSocket.EthComm.sendOneCommand(self, cmdStr=cmdStr, cmd=cmd)
 
-    def safeOneCommand(self, cmdStr, doClose=False, cmd=None, nAttempt=0):
+    def safeOneCommand(self, cmdStr, doClose=False, cmd=None):
         """Used to login.
 
         :param cmd: current command.
@@ -174,19 +207,28 @@ class aten(FSMThread, bufferedSocket.EthComm):
         :raise: Exception with warning message.
         """
         if self.sessionExpired:
-            cmd.debug('text="session might be expired, logging out now..."')
-            self._closeComm(cmd)
+            # session has been idle for a while, but only log in again if it is actually gone.
+            cmd.debug('text="session might be expired, trying anyway..."')
+            try:
+                return self.sendOneCommand(cmdStr, doClose=doClose, cmd=cmd)
+            except Exception:
+                cmd.debug('text="session expired, logging in again..."')
+                self._closeComm(cmd)
 
-        try:
-            return self.sendOneCommand(cmdStr, doClose=doClose, cmd=cmd)
-        except Exception as e:
-            self._closeComm(cmd)
-            if nAttempt < self.maxIOAttempt:
-                cmd.warn('text=%s' % self.actor.strTraceback(e))
+        maxIOAttempt = self.maxIOAttempt
+        waitBetweenAttempt = self.waitBetweenAttempt
+
+        for nAttempt in range(maxIOAttempt + 1):
+            try:
+                return self.sendOneCommand(cmdStr, doClose=doClose, cmd=cmd)
+            except Exception as e:
+                self._closeComm(cmd)
+                if nAttempt == maxIOAttempt:
+                    raise
+
+                cmd.warn(f'text={self.actor.strTraceback(e)}')
                 cmd.warn(f'text="attempt #{nAttempt + 1} to fix connection')
-                time.sleep(self.waitBetweenAttempt)
-                return self.safeOneCommand(cmdStr, doClose=doClose, cmd=cmd, nAttempt=nAttempt + 1)
-            raise
+                time.sleep(waitBetweenAttempt)
 
     def sendOneCommand(self, cmdStr, doClose=False, cmd=None):
         """Send one command and return one response.
@@ -197,16 +239,46 @@ class aten(FSMThread, bufferedSocket.EthComm):
         :return: reply : the single response string, with EOLs stripped.
         :raise: IOError : from any communication errors.
         """
-        fullCmd = '%s%s' % (cmdStr, self.EOL)
         reply = bufferedSocket.EthComm.sendOneCommand(self, cmdStr=cmdStr, doClose=doClose, cmd=cmd)
+        return self.parseReply(cmdStr, reply)
+
+    def sendCommands(self, cmdStrs, cmd=None):
+        """Send several commands within a single packet, then read all responses.
+
+        :param cmdStrs: list of strings to send.
+        :param cmd: current command.
+        :return: replies : list of response strings, in the same order.
+        :raise: IOError : from any communication errors.
+        """
+        cmd = self.actor.bcast if cmd is None else cmd
+
+        sock = self.sendAll(self.EOL.join(cmdStrs))
+        replies = [self.getOneResponse(sock=sock, cmd=cmd) for cmdStr in cmdStrs]
+
+        return [self.parseReply(cmdStr, reply) for cmdStr, reply in zip(cmdStrs, replies)]
+
+    def parseReply(self, cmdStr, reply):
+        """Check that the command was properly echoed and return the actual response.
+
+        :param cmdStr: sent command.
+        :param reply: raw reply.
+        :return: reply : the response string, with echoed command and EOLs stripped.
+        :raise: IOError : if no reply.
+        """
+        fullCmd = f'{cmdStr}{self.EOL}'
 
         if not reply:
             raise IOError(f'no reply from ioBuffer(timeout={self.bufferTimeout}), socket might be broken...')
 
-        if fullCmd not in reply:
+        __, echoed, ret = reply.partition(fullCmd)
+
+        if not echoed:
             raise RuntimeError(f'Command({cmdStr}) was not echoed properly ret:{reply}')
 
-        return reply.split(fullCmd)[1].strip()
+        # session is still alive, keep using it.
+        self.loginTime = time.time()
+
+        return ret.strip()
 
     def connectSock(self):
         """Connect socket if self.sock is None.
@@ -217,6 +289,8 @@ class aten(FSMThread, bufferedSocket.EthComm):
             s = self.createSock()
             s.settimeout(self.socketTimeout)
             s.connect((self.host, self.port))
+            # commands are small and latency-bound, do not let Nagle delay them.
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.sock = s
             self.authenticate()
 
@@ -229,8 +303,16 @@ class aten(FSMThread, bufferedSocket.EthComm):
         """
         pwd = f'pdu.{self.actor.name}' if pwd is None else pwd
         try:
-            self.loginCommand('teladmin', ioEOL='Password: ')
-            self.loginCommand(pwd, ioEOL='Telnet server 1.1\r\n\r\n>')
+            if self.pipelineIO:
+                # send user and password within a single packet, then consume both prompts.
+                sock = self.sendAll(f'teladmin{self.EOL}{pwd}')
+                self.ioBuffer.EOL = 'Password: '
+                self.getOneResponse(sock=sock)
+                self.ioBuffer.EOL = 'Telnet server 1.1\r\n\r\n>'
+                self.getOneResponse(sock=sock)
+            else:
+                self.loginCommand('teladmin', ioEOL='Password: ')
+                self.loginCommand(pwd, ioEOL='Telnet server 1.1\r\n\r\n>')
 
             self.ioBuffer.EOL = '\r\n\r\n>'
             self.loginTime = time.time()
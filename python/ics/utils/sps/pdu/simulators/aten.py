@@ -1,17 +1,23 @@
 import socket
 import time
+from collections import deque
+
 import numpy as np
 
 
 class Sim(socket.socket):
     """ simple aten simulator """
 
-    def __init__(self):
-        """Fake pdu tcp server."""
+    def __init__(self, latency=0.0):
+        """Fake pdu tcp server.
+
+        :param latency: fake delay in seconds added to each connection and command, none by default.
+        """
         socket.socket.__init__(self, socket.AF_INET, socket.SOCK_STREAM)
-        self.buf = []
+        self.latency = latency
+        self.buf = deque()
         self.channels = {}
-        for nb in ['o%s' % (str(i + 1).zfill(2)) for i in range(16)]:
+        for nb in [f'o{str(i + 1).zfill(2)}' for i in range(16)]:
             self.channels[nb] = 'off'
 
         self.vals = {'volt': '240',
@@ -21,53 +27,65 @@ class Sim(socket.socket):
     def connect(self, server):
         """Fake the connection to tcp server."""
         (ip, port) = server
-        time.sleep(0.2)
+        if self.latency:
+            time.sleep(self.latency)
         if type(ip) is not str:
             raise TypeError
         if type(port) is not int:
             raise TypeError
 
-        self.buf.append('Login: \r\n>')
+        self.reply('Login: \r\n>')
 
     def sendall(self, cmdStr, flags=None):
         """Send fake packets, append fake response to buffer."""
-        cmdStr = cmdStr.decode()
-        time.sleep(0.05)
+        # several commands can be sent within a single packet.
+        for line in cmdStr.decode().splitlines(keepends=True):
+            self.processCommand(line)
+
+    def processCommand(self, cmdStr):
+        """Append fake response to buffer."""
+        if self.latency:
+            time.sleep(self.latency)
         if cmdStr == 'teladmin\r\n':
-            self.buf.append('Password: ')
+            self.reply('Password: ')
 
         elif 'pdu.enu_sm' in cmdStr:
-            self.buf.append('Telnet server 1.1\r\n\r\n> ')
+            self.reply('Telnet server 1.1\r\n\r\n> ')
 
         elif 'pfsait' in cmdStr:
-            self.buf.append('Telnet server 1.1\r\n\r\n> ')
+            self.reply('Telnet server 1.1\r\n\r\n> ')
 
         elif 'read status' in cmdStr:
             __, __, nb, __ = cmdStr.split(' ')
-            self.buf.append('%s%s\r\n\r\n> ' % (cmdStr, self.channels[nb]))
+            self.reply(f'{cmdStr}{self.channels[nb]}\r\n\r\n> ')
 
         elif 'read meter olt' in cmdStr:
             _, _, _, _, val, _ = cmdStr.split(' ')
-            self.buf.append('%s%s\r\n\r\n> ' % (cmdStr, self.vals[val]))
+            self.reply(f'{cmdStr}{self.vals[val]}\r\n\r\n> ')
 
         elif 'read meter dev' in cmdStr:
             _, _, _, val, _ = cmdStr.split(' ')
-            self.buf.append('%s%s\r\n\r\n> ' % (cmdStr, self.vals[val]))
+            self.reply(f'{cmdStr}{self.vals[val]}\r\n\r\n> ')
 
         elif 'sw o' in cmdStr:
             __, nb, state, __ = cmdStr.split(' ')
             self.channels[nb] = state
-            self.buf.append('%sOutlet<%s> command is setting\r\n\r\n> ' % (cmdStr, nb))
+            self.reply(f'{cmdStr}Outlet<{nb}> command is setting\r\n\r\n> ')
         elif 'read sensor o01 simple' in cmdStr:
             temps = 10 + np.random.normal(0, 0.1)
             humidity = 60 + np.random.normal(0, 0.1)
-            self.buf.append(f'{cmdStr}{temps:.2f}\r\n{humidity:.2f}\r\n{"NA"}\r\n\r\n> ')
+            self.reply(f'{cmdStr}{temps:.2f}\r\n{humidity:.2f}\r\n{"NA"}\r\n\r\n> ')
+
+    def reply(self, response):
+        """Append fake response to buffer, already encoded."""
+        self.buf.append(response.encode('latin-1'))
 
     def recv(self, buffersize, flags=None):
         """Return and remove fake response from buffer."""
-        ret = self.buf[0]
-        self.buf = self.buf[1:]
-        return str(ret).encode()
+        if not self.buf:
+            raise IOError
+
+        return self.buf.popleft()
 
     def close(self):
         pass
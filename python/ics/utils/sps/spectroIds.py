@@ -1,3 +1,4 @@
+import functools
 import logging
 import os
 import re
@@ -25,8 +26,12 @@ def idFromHostname(hostname=None):
     return None
 
 
+@functools.lru_cache(maxsize=None)
 def getSite():
-    """ Return the site name. Extracted from a DNS TXT record. """
+    """ Return the site name. Extracted from a DNS TXT record.
+
+    The site cannot change within a process, so the DNS lookup is only done once.
+    """
 
     defaultSite = 'S'
 
@@ -1,7 +1,18 @@
+import functools
 import logging
+import re
 import select
 import socket
 
+# telnet IAC followed by either WILL|WONT|DO|DONT and its option, or any single byte code.
+TELNET_CODES = re.compile('\xff(?:[\xfb-\xfe].|.)', re.DOTALL)
+
+
+@functools.lru_cache(maxsize=None)
+def _encodeEOL(EOL):
+    """Return EOL as bytes, only a handful of distinct EOL are ever used so just cache them."""
+    return EOL.encode('latin-1')
+
 
 class EthComm(object):
     def __init__(self, host, port, EOL='\r\n', stripTelnet=False):
@@ -12,12 +23,13 @@ class EthComm(object):
         self.EOL = EOL
         self.stripTelnet = stripTelnet
 
-        try:
-            self.logger.debug(f'instanciating EthComm {host}:{port}')
-        except AttributeError:
+        # controllers usually come with their own logger.
+        if getattr(self, 'logger', None) is None:
             self.logger = logging.getLogger(f'{host}:{port}')
             self.logger.setLevel(logging.DEBUG)
 
+        self.logger.debug(f'instanciating EthComm {host}:{port}')
+
     def createSock(self):
         """Create regular socket object."""
         return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -28,6 +40,8 @@ class EthComm(object):
             s = self.createSock()
             s.settimeout(timeout)
             s.connect((self.host, self.port))
+            # commands are small and latency-bound, do not let Nagle delay them.
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
             self.sock = s
 
@@ -84,7 +98,7 @@ class EthComm(object):
         sock : socket.socket
             the opened socket.
         """
-        fullCmd = ('%s%s' % (cmdStr, self.EOL)).encode('latin-1')
+        fullCmd = cmdStr.encode('latin-1') + _encodeEOL(self.EOL)
         self.logger.debug('sending %r', fullCmd)
 
         sock = self.connectSock()
@@ -148,30 +162,12 @@ class EthComm(object):
         reply : str
             stripped string.
         """
-        IAC = chr(255)
-        NOP = 241
-        WILL = 251
-        WONT = 252
-        DO = 253
-        DONT = 254
-
-        while True:
-            start = s.find(IAC)
-            if start == -1:
-                return s
-            s1 = s[:start]
-            cmd = ord(s[start + 1])
-            if cmd in {WILL, WONT, DO, DONT}:
-                cmd2 = ord(s[start + 2])
-                s2 = s[start + 3:]
-            elif cmd in {NOP}:
-                cmd2 = 'OK'
-                s2 = s[start + 2:]
-            else:
-                cmd2 = 'UNKNOWN!'
-                s2 = s[start + 2:]
-            self.logger.debug(f'stripping {cmd}.{cmd2}')
-            s = s1 + s2
+        stripped = TELNET_CODES.sub('', s)
+
+        if len(stripped) != len(s):
+            self.logger.debug('stripping %s', [[ord(c) for c in code[1:]] for code in TELNET_CODES.findall(s)])
+
+        return stripped
 
 
 class BufferedSocket(object):
@@ -185,10 +181,28 @@ class BufferedSocket(object):
         self.logger.setLevel(logLevel)
         self.timeout = timeout
 
+        self.reset()
+
+    @property
+    def buffer(self):
+        """Pending input, not yet returned as a response."""
+        return self._buffer[self._cursor:].decode('latin-1')
+
+    @buffer.setter
+    def buffer(self, buffer):
+        self._buffer = bytearray(buffer.encode('latin-1'))
+        self._cursor = 0
+
+    def reset(self):
+        """Discard any buffered input."""
         self.buffer = ''
 
     def getOutput(self, sock=None, timeout=None, cmd=None):
-        """Block/timeout for input, then return all (<=1kB) available input."""
+        """Block/timeout for input, then return all (<=64kB) available input."""
+        return self._getOutput(sock=sock, timeout=timeout, cmd=cmd).decode('latin-1')
+
+    def _getOutput(self, sock=None, timeout=None, cmd=None):
+        """Block/timeout for input, then return all (<=64kB) available input as bytes."""
         if sock is None:
             sock = self.sock
 
@@ -202,7 +216,7 @@ class BufferedSocket(object):
             cmd.warn('text="%s"' % (msg))
             raise IOError(msg)
 
-        return sock.recv(1024).decode('latin-1')
+        return sock.recv(65536)
 
     def getOneResponse(self, sock=None, timeout=None, cmd=None, doRaise=False):
         """Return the next available complete line. Fetch new input if necessary.
@@ -219,24 +233,35 @@ class BufferedSocket(object):
         ret : str
             a single line of response text, with EOL character(s) stripped.
         """
-        while self.buffer.find(self.EOL) == -1:
+        # EOL can be changed on the fly, or even set at class level.
+        eolBytes = _encodeEOL(self.EOL)
+        eolAt = self._buffer.find(eolBytes, self._cursor)
+
+        while eolAt == -1:
             try:
-                more = self.getOutput(sock=sock, timeout=timeout, cmd=cmd)
+                more = self._getOutput(sock=sock, timeout=timeout, cmd=cmd)
                 if not more:
                     if doRaise:
                         raise IOError("getOneResponse received nothing.")
-                    else:
-                        return self.getOneResponse(sock=sock, timeout=timeout, cmd=cmd, doRaise=True)
+                    # give it one more try.
+                    doRaise = True
+                    continue
 
             except IOError:
                 return ''
 
             self.logger.debug('%s added: %r' % (self.name, more))
-            self.buffer += more
-
-        eolAt = self.buffer.find(self.EOL)
-        ret = self.buffer[:eolAt]
-
-        self.buffer = self.buffer[eolAt + len(self.EOL):]
+            # no need to scan again what has already been searched, but EOL might be split across two reads.
+            start = max(self._cursor, len(self._buffer) - len(eolBytes) + 1)
+            self._buffer += more
+            eolAt = self._buffer.find(eolBytes, start)
+
+        ret = self._buffer[self._cursor:eolAt].decode('latin-1')
+        self._cursor = eolAt + len(eolBytes)
+
+        # compact the buffer once most of it has been consumed.
+        if self._cursor > len(self._buffer) // 2:
+            del self._buffer[:self._cursor]
+            self._cursor = 0
 
         return ret
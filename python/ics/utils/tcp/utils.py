@@ -1,3 +1,5 @@
+import errno
+import select
 import socket
 import time
 
@@ -9,29 +11,44 @@ def wait(secs=5):
 def serverIsUp(host, port, timeout=1):
     """Check is tcp server is up. """
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.settimeout(timeout)
+    s.setblocking(False)
     try:
-        s.connect((host, port))
+        ret = s.connect_ex((host, port))
+        if ret not in {0, errno.EINPROGRESS}:
+            return False
+        # wait for the connection to complete, socket is writable as soon as it does (or fails).
+        __, writers, __ = select.select([], [s], [], timeout)
+        if not writers:
+            return False
+        return s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
     except:
-        wait(secs=timeout)
         return False
     finally:
         s.close()
 
-    return True
-
 
-def waitForTcpServer(host, port, cmd=None, timeout=60):
-    """Wait until server connection can be opened. """
+def waitForTcpServer(host, port, cmd=None, timeout=60, maxDelay=2):
+    """Wait until server connection can be opened, probing with exponential backoff. """
     start = time.time()
     port = int(port)
+    delay = 0.1
 
     if cmd is not None:
         cmd.inform(f'text="waiting for {host}:{port} server..."')
 
-    while not serverIsUp(host, port):
+    # resolve hostname only once, rather than on each probe.
+    try:
+        address = socket.gethostbyname(host)
+    except socket.gaierror:
+        address = host
+
+    while not serverIsUp(address, port):
         if time.time() - start > timeout:
             raise TimeoutError('tcp server %s:%d is not running' % (host, port))
 
+        wait(secs=delay)
+        delay = min(2 * delay, maxDelay)
+
+    # freshly powered hosts accept connections before their server is actually ready, let it settle.
     wait()
     return True
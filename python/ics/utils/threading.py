@@ -1,25 +1,30 @@
-import time
-from functools import partial
+import itertools
 
 import actorcore.Actor as coreActor
 from actorcore.QThread import QThread
 from ics.utils.fsm.fsmThread import LockedThread
 
+# unique suffix for single shot thread names.
+singleShotCounter = itertools.count()
+
 
 def getThread(instance, threadClass=QThread):
     """ Be robust about being called from QThread itself or the ActorCmd.py"""
     if isinstance(instance, threadClass):
         return instance
-    elif hasattr(instance, 'controller') and isinstance(instance.controller, threadClass):
-        return instance.controller
-    else:
-        raise RuntimeError('havent found any available thread to put func on')
+
+    # not cached on purpose, the controller can be disconnected and reconnected at any time.
+    controller = getattr(instance, 'controller', None)
+    if isinstance(controller, threadClass):
+        return controller
+
+    raise RuntimeError('havent found any available thread to put func on')
 
 
 def putMsg(func):
     def wrapper(self, cmd, *args, **kwargs):
         thread = getThread(self)
-        thread.putMsg(partial(func, self, cmd, *args, **kwargs))
+        thread.putMsg(func, self, cmd, *args, **kwargs)
 
     return wrapper
 
@@ -33,9 +38,9 @@ def putAndExit(func):
         else:
             raise RuntimeError('this must run within an actor.')
 
-        thr = QThread(actor, str(time.time()))
+        thr = QThread(actor, f'oneshot-{next(singleShotCounter)}')
         thr.start()
-        thr.putMsg(partial(func, self, cmd, *args, **kwargs))
+        thr.putMsg(func, self, cmd, *args, **kwargs)
         thr.exitASAP = True
 
     return wrapper
@@ -52,21 +57,12 @@ def mhsFunc(func):
 
 
 def threaded(func):
-    @putMsg
-    @mhsFunc
-    def wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
-
-    return wrapper
+    # mhsFunc wrapper is directly put on the queue, no need for an extra pass-through frame.
+    return putMsg(mhsFunc(func))
 
 
 def singleShot(func):
-    @putAndExit
-    @mhsFunc
-    def wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
-
-    return wrapper
+    return putAndExit(mhsFunc(func))
 
 
 def checkAndPut(func):
@@ -75,7 +71,7 @@ def checkAndPut(func):
         if thread.isLocked:
             raise RuntimeWarning(f'{thread.name} is busy')
 
-        thread.putMsg(partial(func, self, cmd, *args, **kwargs))
+        thread.putMsg(func, self, cmd, *args, **kwargs)
 
     return wrapper
 
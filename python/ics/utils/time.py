@@ -3,10 +3,10 @@ from datetime import datetime
 
 from astropy import time as astroTime
 from ics.utils.sps.spectroIds import getSite
-from pytz import timezone
+from zoneinfo import ZoneInfo
 
-UTC = timezone('UTC')
-HST = timezone('US/Hawaii')
+UTC = ZoneInfo('UTC')
+HST = ZoneInfo('Pacific/Honolulu')
 
 site = getSite()
 
@@ -37,8 +37,8 @@ class Time(astroTime.core.Time):
         if localized.tzinfo is None:
             raise RuntimeError(f'{localized} is not localized...')
 
-        # convert to UTC in any case.
-        utcTime = localized.astimezone(UTC)
+        # convert to UTC in any case, no need if already referenced to UTC.
+        utcTime = localized if localized.tzinfo is UTC else localized.astimezone(UTC)
         # convert to astroTime.
         return cls(utcTime)
 
@@ -49,10 +49,17 @@ class Time(astroTime.core.Time):
         -------
         pfsTime: `Time`
         """
-        # force utc and localize this datetime.
-        utcTime = datetime.now(UTC)
-        # use from datetime constructor
-        return Time.fromdatetime(utcTime)
+        # epoch is always UTC, much cheaper than going through the datetime constructor.
+        return Time(time.time(), format='unix', scale='utc')
+
+    @staticmethod
+    def nowIsoformat(microsecond=True):
+        """ Return current date and time directly as isoformat, skipping astropy entirely.
+        Returns
+        -------
+        datestr: `str`
+        """
+        return convert.datetime_to_isoformat(datetime.now(UTC), microsecond=microsecond)
 
     @staticmethod
     def fromtimestamp(timestamp):
@@ -66,10 +73,8 @@ class Time(astroTime.core.Time):
         -------
         pfsTime: `Time`
         """
-        # convert to localized datetime
-        localized = convert.datetime_from_timestamp(timestamp)
-        # use from datetime constructor
-        return Time.fromdatetime(localized)
+        # timestamp should always be epoch UTC, no need for an intermediate datetime.
+        return Time(timestamp, format='unix', scale='utc')
 
     @staticmethod
     def fromisoformat(datestr):
@@ -104,7 +109,8 @@ class Time(astroTime.core.Time):
         -------
         timestamp: `float`
         """
-        return self.to_datetime().timestamp()
+        # epoch is directly available, no need to rebuild a datetime field by field.
+        return self.unix
 
     def isoformat(self, microsecond=True):
         """ Convert to isoformat.
@@ -115,6 +121,11 @@ class Time(astroTime.core.Time):
         return convert.datetime_to_isoformat(self.to_datetime(), microsecond=microsecond)
 
 
+# isoformat with and without microsecond, Z for UTC and nothing for local, eg HST.
+isoFormats = {microsecond: f'%Y-%m-%dT%H:%M:%S{".%f" if microsecond else ""}{"Z" if Time.localTZ is UTC else ""}'
+              for microsecond in (True, False)}
+
+
 class convert(object):
     @staticmethod
     def datetime_from_isoformat(datestr):
@@ -130,11 +141,8 @@ class convert(object):
         """
         # ugly but could not find any quick workaround.
         iso, tz = (datestr[:-1], UTC) if datestr[-1] == 'Z' else (datestr, HST)
-        # convert from iso
-        local = datetime.fromisoformat(iso)
-        # convert to timezone and localize
-        localized = tz.localize(local)
-        return localized
+        # convert from iso and localize, zoneinfo resolves any DST by itself.
+        return datetime.fromisoformat(iso).replace(tzinfo=tz)
 
     @staticmethod
     def datetime_from_timestamp(timestamp):
@@ -167,12 +175,7 @@ class convert(object):
         if datetime.tzinfo is None:
             raise RuntimeError(f'{datetime} is not localized...')
 
-        fmt = '%Y-%m-%dT%H:%M:%S'
-        # add microsecond if necessary.
-        fmt = f'{fmt}.%f' if microsecond else fmt
-        # add Z for UTC and nothing for local, eg HST.
-        fmt = f'{fmt}Z' if Time.localTZ == UTC else fmt
-        return datetime.astimezone(Time.localTZ).strftime(fmt)
+        return datetime.astimezone(Time.localTZ).strftime(isoFormats[bool(microsecond)])
 
 
 class sleep(object):
@@ -1,24 +1,84 @@
-import glob
+import functools
 import logging
+import operator
 import os
+import re
 
 import ics.utils.visit.pfsVisit as pfsVisit
 import pfs.utils.ingestPfsDesign as ingestPfsDesign
 from pfs.datamodel import PfsDesign, PfsConfig
 
+logger = logging.getLogger('pfsField')
+
+# pfsDesign files are immutable, no need to parse them again when the same design is re-declared.
+readPfsDesign = functools.lru_cache(maxsize=8)(PfsDesign.read)
+
+rawRoot = '/data/raw'
+# pfsConfig0 is looked for in the most recent date directories only.
+maxDateDirs = 2
+# nightly directories are named after the date, eg 2023-05-12.
+dateDirRegex = re.compile(r'^20\d{2}-\d{2}-\d{2}$')
+
+
+def _iterRecentDateDirs(rawRoot=rawRoot, maxDateDirs=maxDateDirs):
+    """Yield the most recent date directories, ISO date names sort chronologically so no need to stat them."""
+    # is_dir() is served from the directory entry itself, no extra stat except for symlinks.
+    with os.scandir(rawRoot) as entries:
+        dateNames = [entry.name for entry in entries if dateDirRegex.match(entry.name) and entry.is_dir()]
+
+    dateNames.sort(reverse=True)
+
+    for dateName in dateNames[:maxDateDirs]:
+        yield os.path.join(rawRoot, dateName)
+
+
+def _pfsConfigFileName(designId, visit0):
+    """Return pfsConfig file name, same as pfs.datamodel naming."""
+    return f'pfsConfig-0x{designId:016x}-{visit0:06d}.fits'
+
+
+@functools.lru_cache(maxsize=256)
+def _findPfsConfigPathCached(designId, visit0):
+    """Return the full path and the directory of a given pfsConfig file, raise FileNotFoundError if not found.
+    Exceptions are not cached by lru_cache, so only successful lookups are remembered."""
+    fileName = _pfsConfigFileName(designId, visit0)
+
+    for dateDir in _iterRecentDateDirs():
+        dirName = os.path.join(dateDir, 'pfsConfig')
+        pfsConfigPath = os.path.join(dirName, fileName)
+        if os.path.isfile(pfsConfigPath):
+            return pfsConfigPath, dirName
+
+    raise FileNotFoundError(fileName)
+
+
+def _findPfsConfigPath(designId, visit0):
+    """Return the full path and the directory of a given pfsConfig file, None if not found."""
+    try:
+        return _findPfsConfigPathCached(designId, visit0)
+    except FileNotFoundError:
+        return None
+
 
 class PfsField(object):
     """Hold pfsDesign, visit0, pfsConfig..."""
+    # persisted in that order.
+    subsystems = ('ag', 'fps', 'sps')
+    # fetch all subsystem visits in a single call.
+    orderedVisits = operator.itemgetter(*subsystems)
+    __slots__ = ('iicActor', 'visit', 'pfsDesign', 'pfsDesignIdStr', 'gratingPosition', 'pfsConfig0')
 
     def __init__(self, iicActor, pfsDesignId, agV, fpsV, spsV):
-        self.logger = logging.getLogger('pfsField')
         self.iicActor = iicActor
         self.visit = dict(ag=pfsVisit.AgVisit(agV, name='visit0'),
                           fps=pfsVisit.FpsVisit(fpsV, name='visit0'),
                           sps=pfsVisit.SpsVisit(spsV, name='visit0'))
 
         pfsDesignId = int(pfsDesignId, 16) if isinstance(pfsDesignId, str) else pfsDesignId
-        self.pfsDesign = PfsDesign.read(pfsDesignId, dirName=iicActor.actorConfig['pfsDesign']['rootDir'])
+        self.pfsDesign = readPfsDesign(pfsDesignId, dirName=iicActor.actorConfig['pfsDesign']['rootDir'])
+        # pfsDesign cannot change, so its persisted form can be formatted once.
+        self.pfsDesignIdStr = f'0x{self.pfsDesign.pfsDesignId:016x}'
+        self.gratingPosition = PfsField.gratingPositionFromArms(self.pfsDesign.arms)
         self.pfsConfig0 = None
 
         # try to reload pfsConfig as well as it might already exist.
@@ -50,9 +110,8 @@ class PfsField(object):
 
     def persist(self):
         """Persist pfsField members to disk."""
-        self.iicActor.actorData.persistKey('pfsField',
-                                           '0x%016x' % self.pfsDesign.pfsDesignId,
-                                           *[self.visit[sub].visitId for sub in ['ag', 'fps', 'sps']])
+        self.iicActor.actorData.persistKey('pfsField', self.pfsDesignIdStr,
+                                           *[visit.visitId for visit in PfsField.orderedVisits(self.visit)])
 
     def getVisit(self, caller):
         """Get visit for caller."""
@@ -66,8 +125,8 @@ class PfsField(object):
         """visit got bumped up."""
         self.visit[caller] = newVisit
 
-        # keep sps and ag in sync
-        if caller == 'sps':
+        # keep sps and ag in sync, but do not reset an ag visit which is already on that visitId.
+        if caller == 'sps' and self.visit['ag'].visitId != newVisit.visitId:
             self.visit['ag'] = pfsVisit.AgVisit(newVisit.visitId)
 
         # persist visits to disk.
@@ -75,7 +134,25 @@ class PfsField(object):
 
     def getGratingPosition(self):
         """
-        Return the required red grating position from the PfsDesign.
+        Return the required red grating position from the PfsDesign, computed once since pfsDesign cannot change.
+
+        Returns
+        -------
+        str
+            The required red grating position, either 'low' or 'med'. If both or neither
+            of the positions are present in the PFS design, returns None.
+        """
+        return self.gratingPosition
+
+    @staticmethod
+    def gratingPositionFromArms(arms):
+        """
+        Return the required red grating position from the PfsDesign arms.
+
+        Parameters
+        ----------
+        arms : `str`
+            PfsDesign arms.
 
         Returns
         -------
@@ -83,8 +160,8 @@ class PfsField(object):
             The required red grating position, either 'low' or 'med'. If both or neither
             of the positions are present in the PFS design, returns None.
         """
-        lowRes = 'r' in self.pfsDesign.arms
-        medRes = 'm' in self.pfsDesign.arms
+        lowRes = 'r' in arms
+        medRes = 'm' in arms
 
         if lowRes and not medRes:
             position = 'low'
@@ -99,7 +176,7 @@ class PfsField(object):
         """Create and return a new pfsConfig object for this visit."""
         # no pfsConfig0 means that there is no matching fps.pfsConfig, so create it from pfsDesign.
         if self.pfsConfig0 is None:
-            self.logger.info('pfsConfig0 is not available, creating it from current PfsDesign.')
+            logger.info('pfsConfig0 is not available, creating it from current PfsDesign.')
             self.pfsConfig0 = PfsConfig.fromPfsDesign(self.pfsDesign, visit=visitId,
                                                       pfiCenter=self.pfsDesign.pfiNominal)
             ingestPfsDesign.ingestPfsConfig(self.pfsConfig0)
@@ -116,19 +193,26 @@ class PfsField(object):
         if designId != self.pfsDesignId:
             return
 
-        lastDate = max(glob.glob(os.path.join('/data/raw', '*/')), key=os.path.getmtime)
-        dirName = os.path.join(lastDate, 'pfsConfig')
-        pfsConfigPath = os.path.join(dirName, 'pfsConfig-0x%016x-%06d.fits' % (designId, visit0))
+        found = _findPfsConfigPath(designId, visit0)
 
-        # do not raise error at this point.
-        if not os.path.isfile(pfsConfigPath) and doIgnore:
-            return
+        if found is None:
+            # do not raise error at this point.
+            if doIgnore:
+                return
+
+            # let PfsConfig.read fail and report it below.
+            dirName = os.path.join(next(_iterRecentDateDirs(), rawRoot), 'pfsConfig')
+            pfsConfigPath = os.path.join(dirName, _pfsConfigFileName(designId, visit0))
+        else:
+            pfsConfigPath, dirName = found
 
-        self.logger.info(f'loading pfsConfig0 from {pfsConfigPath}')
+        logger.info('loading pfsConfig0 from %s', pfsConfigPath)
         try:
             self.pfsConfig0 = PfsConfig.read(designId, visit0, dirName=dirName)
         except Exception as e:
-            self.logger.warning(str(e), exc_info=True)
+            # cached location might not be valid anymore.
+            _findPfsConfigPathCached.cache_clear()
+            logger.warning('%s', e, exc_info=True)
 
     def holdPfsConfig0(self, pfsConfig0):
         """Same pfsDesign was re-declared, hold on to the latest pfsConfig0"""
@@ -136,6 +220,5 @@ class PfsField(object):
         if pfsConfig0 is None:
             return
 
-        self.logger.info(
-            f'holding pfsConfig0 from pfsConfig-0x%016x-%06d.fits' % (pfsConfig0.pfsDesignId, pfsConfig0.visit))
+        logger.info('holding pfsConfig0 from %s', _pfsConfigFileName(pfsConfig0.pfsDesignId, pfsConfig0.visit))
         self.pfsConfig0 = pfsConfig0
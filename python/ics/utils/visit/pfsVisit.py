@@ -3,9 +3,15 @@ import threading
 import ics.utils.visit.exception as exception
 from ics.utils.opdb import opDB
 
+# frame id increments are tiny, a single lock shared by all visits is enough and spares one lock per visit.
+frameIdLock = threading.Lock()
+
 
 class Visit(object):
     exposureTable = ""
+    # a visit is created for every exposure cycle, keep it small.
+    __slots__ = ('visitId', 'caller', 'name', 'isActive', 'iAmDead', 'populated', '__frameId', 'frameIdBase',
+                 'strPrefix')
 
     def __init__(self, visitId, caller='iic', name=None):
         self.visitId = visitId
@@ -14,12 +20,17 @@ class Visit(object):
 
         self.isActive = False
         self.iAmDead = False
+        # a populated visit stays populated, so only a positive answer is cached.
+        self.populated = False
 
         self.__frameId = 0
-        self.idLock = threading.RLock()
+        # frame ids are visitId * 100 + frameIdx.
+        self.frameIdBase = visitId * 100
+        # only the frame id changes, so format the rest once.
+        self.strPrefix = f"Visit(name={name} caller={caller} visitId={visitId}"
 
     def __str__(self):
-        return f"Visit(name={self.name} caller={self.caller} visitId={self.visitId} subVisit={self.__frameId}"
+        return f"{self.strPrefix} subVisit={self.__frameId}"
 
     def __enter__(self):
         """Context manager on with statement."""
@@ -32,31 +43,34 @@ class Visit(object):
 
     @property
     def isPopulated(self):
-        return opDB.fetchone(f'select pfs_visit_id from {self.exposureTable} where pfs_visit_id={self.visitId}')
+        if not self.populated:
+            exists, = opDB.fetchone(f'select exists(select 1 from {self.exposureTable} where pfs_visit_id=%(visitId)s)',
+                                    dict(visitId=self.visitId))
+            self.populated = bool(exists)
+
+        return self.populated
 
     @staticmethod
     def fromCaller(visitId, caller, name):
-        if caller == 'sps':
-            return SpsVisit(visitId, name)
-        elif caller in ['mcs', 'fps']:
-            return FpsVisit(visitId, name)
-        elif caller in ['ag', 'agc']:
-            return AgVisit(visitId, name)
-        else:
-            raise ValueError(f'unknown caller:{caller}')
+        try:
+            visitClass = visitClassPerCaller[caller]
+        except KeyError:
+            raise ValueError(f'unknown caller:{caller}') from None
+
+        return visitClass(visitId, name)
 
     def nextFrameId(self):
         """Get subvisit frameId."""
         if self.iAmDead:
             raise exception.VisitAlreadyDone()
 
-        with self.idLock:
+        with frameIdLock:
             frameIdx = self.__frameId
             if frameIdx >= 100:
                 raise exception.VisitOverflowed()
             self.__frameId += 1
 
-        return self.visitId * 100 + frameIdx
+        return self.frameIdBase + frameIdx
 
     def frameId(self):
         """Frame id accessor."""
@@ -77,6 +91,7 @@ class Visit(object):
 
 class AgVisit(Visit):
     exposureTable = 'agc_exposure'
+    __slots__ = ()
 
     def __init__(self, visitId, name=None):
         Visit.__init__(self, visitId, 'ag', name=name)
@@ -88,21 +103,46 @@ class AgVisit(Visit):
 
 class FpsVisit(Visit):
     exposureTable = 'mcs_exposure'
+    __slots__ = ('pfsConfig0Populated',)
 
     def __init__(self, visitId, name=None):
         Visit.__init__(self, visitId, 'fps', name=name)
+        # same as populated, a pfsConfig0 cannot be removed.
+        self.pfsConfig0Populated = False
 
     @property
     def isAvailable(self):
-        return not (self.isActive or self.isPopulated or self.isPfsConfig0Populated)
+        if self.isActive:
+            return False
+
+        # both opdb checks are needed, fetch them within a single round-trip.
+        if not (self.populated or self.pfsConfig0Populated):
+            self.probeOpDB()
+
+        return not (self.populated or self.pfsConfig0Populated)
+
+    def probeOpDB(self):
+        """Check both mcs_exposure and pfs_config for that visit with a single query."""
+        populated, pfsConfig0Populated = opDB.fetchone(
+            f'select exists(select 1 from {self.exposureTable} where pfs_visit_id=%(visitId)s), '
+            f'exists(select 1 from pfs_config where visit0=%(visitId)s)', dict(visitId=self.visitId))
+
+        self.populated = bool(populated)
+        self.pfsConfig0Populated = bool(pfsConfig0Populated)
 
     @property
     def isPfsConfig0Populated(self):
-        return opDB.fetchone(f'select visit0 from pfs_config where visit0={self.visitId}')
+        if not self.pfsConfig0Populated:
+            exists, = opDB.fetchone('select exists(select 1 from pfs_config where visit0=%(visitId)s)',
+                                    dict(visitId=self.visitId))
+            self.pfsConfig0Populated = bool(exists)
+
+        return self.pfsConfig0Populated
 
 
 class SpsVisit(Visit):
     exposureTable = 'sps_visit'
+    __slots__ = ()
 
     def __init__(self, visitId, name=None):
         Visit.__init__(self, visitId, 'sps', name=name)
@@ -111,3 +151,7 @@ class SpsVisit(Visit):
     def isAvailable(self):
         """We actually always bump up sps after field acquisition."""
         return False
+
+
+# single lookup instead of an if/elif chain for each new visit.
+visitClassPerCaller = dict(sps=SpsVisit, mcs=FpsVisit, fps=FpsVisit, ag=AgVisit, agc=AgVisit)
@@ -12,9 +12,10 @@ class VisitManager(object):
 
     def reloadField(self):
         """Reload persisted pfsField."""
+        # nothing persisted, finished field or missing design, start without any field but let SystemExit through.
         try:
             persisted = pfsField.PfsField.reload(self.actor)
-        except:
+        except Exception:
             persisted = None
 
         return persisted
@@ -50,12 +51,14 @@ class VisitManager(object):
 
     def getVisit(self, caller, name=None):
         """Get visit, visit0 if available otherwise new one."""
-        if self.activeField:
-            if not self.activeField.isVisitAvailableFor(caller):
+        activeField = self.activeField
+
+        if activeField:
+            if not activeField.isVisitAvailableFor(caller):
                 new = self.newVisit(caller, name=name)
-                self.activeField.reconfigure(caller=caller, newVisit=new)
+                activeField.reconfigure(caller=caller, newVisit=new)
 
-            return self.activeField.getVisit(caller)
+            return activeField.getVisit(caller)
 
         return self.newVisit(caller, name=name)
 